@@ -5,13 +5,14 @@
 import configparser
 import os
 import re
-from logging import getLogger
+from logging import DEBUG, getLogger
 from queue import Empty, Queue
-from time import sleep, time
+from time import monotonic, time
 from typing import Any, Callable, Dict, List, Optional
 
 from gcode_metadata import get_metadata
 from requests import RequestException, Response, Session  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
 
 # pylint: disable=redefined-builtin
 from requests.exceptions import ConnectionError  # type: ignore
@@ -26,6 +27,7 @@ from .const import MMU_SLOT_COUNTS
 from .download import DownloadMgr, Transfer
 from .files import Filesystem, InotifyHandler, delete
 from .models import (
+    Batch,
     CameraRegister,
     Event,
     LoopObject,
@@ -33,7 +35,7 @@ from .models import (
     Sheet,
     Telemetry,
 )
-from .util import RetryingSession, get_timestamp
+from .util import RetryingSession, get_timestamp, json_dumps, json_loads
 
 __version__ = "0.8.1"
 __date__ = "25 Jun 2024"  # version date
@@ -50,6 +52,7 @@ __url__ = "https://github.com/prusa3d/Prusa-Connect-SDK-Printer"
 # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-instance-attributes
+# pylint: disable=too-many-lines
 # NOTE: Temporary for pylint with python3.9
 # pylint: disable=unsubscriptable-object
 
@@ -78,8 +81,6 @@ class Printer:
     # pylint: disable=too-many-public-methods
 
     queue: "Queue[LoopObject]"
-    server: Optional[str] = None
-    token: Optional[str] = None
     conn: Session
 
     # Printer firmware version
@@ -94,10 +95,24 @@ class Printer:
                  sn: Optional[str] = None,
                  fingerprint: Optional[str] = None,
                  max_retries: int = 1,
-                 mmu_supported: bool = True):
+                 mmu_supported: bool = True,
+                 *,
+                 max_batch_size: int = 1,
+                 compress_payloads: bool = False):
+        # pylint: disable=too-many-statements
         self.__type = type_
+        self.__type_info = self.__get_type_info()
         self.__sn = sn
         self.__fingerprint = fingerprint
+        self.__initialised = False
+        self.__update_initialised()
+        self.__token: Optional[str] = None
+        self.__server: Optional[str] = None
+        # Request urls by endpoint, prepared when the server is set
+        self.__urls: Dict[str, str] = {}
+        # Static part of the request headers, see make_headers
+        self.__headers: Dict[str, str] = {}
+        self.__update_headers()
         self.network_info = {
             "lan_mac": None,
             "lan_ipv4": None,
@@ -128,8 +143,24 @@ class Printer:
             self.conn = RetryingSession(max_retries=max_retries)
         else:
             self.conn = Session()
+        # Keep the connections to Connect alive, even when the loop and
+        # the camera uploads use the session at the same time
+        adapter = HTTPAdapter(pool_connections=const.POOL_CONNECTIONS,
+                              pool_maxsize=const.POOL_MAXSIZE)
+        self.conn.mount("https://", adapter)
+        self.conn.mount("http://", adapter)
 
         self.queue = Queue()
+        # Consecutive telemetries or events are sent together in batches
+        # of up to max_batch_size items, 1 means no batching at all
+        self.max_batch_size = max_batch_size
+        # Bigger payloads are sent gzip compressed, Connect must accept them
+        self.compress_payloads = compress_payloads
+        self.__pending: Optional[LoopObject] = None
+        # How long to wait for the next item, grows while idle
+        self.__idle_timeout = const.TIMESTAMP_PRECISION
+        # Pending registrations waiting for their next poll, oldest first
+        self.__polling: List[Register] = []
 
         self.command = Command(self.event_cb)
         self.set_handler(const.Command.SEND_INFO, self.send_info)
@@ -171,6 +202,13 @@ class Printer:
                                         self.download_finished_cb)
         self.camera_controller = CameraController(self.conn, self.server,
                                                   self.send_cb)
+        # Handlers of the Connect responses by the kind of the sent object
+        self.__response_handlers: Dict[type, Callable[[Any, Response],
+                                                      None]] = {
+            Telemetry: self.__telemetry_response,
+            Register: self.__register_response,
+            CameraRegister: self.__camera_register_response,
+        }
         self.__running_loop = False
 
     @staticmethod
@@ -194,6 +232,12 @@ class Printer:
         """Return if loop is running (if was started but not stopped)."""
         return self.__running_loop
 
+    @property
+    def idle_timeout(self):
+        """Returns how long the loop waits for the next item. It doubles
+        while the queue stays empty, up to MAX_IDLE_TIMEOUT."""
+        return self.__idle_timeout
+
     @property
     def printed_file_cb(self):
         """Returns path of currently printed file"""
@@ -231,6 +275,37 @@ class Printer:
         if self.__fingerprint is not None:
             raise RuntimeError("Fingerprint is already set.")
         self.__fingerprint = value
+        self.__update_initialised()
+        self.__update_headers()
+
+    @property
+    def server(self):
+        """Returns Connect server url."""
+        return self.__server
+
+    @server.setter
+    def server(self, value):
+        """Set Connect server url and prepare the request urls."""
+        self.__server = value
+        if value:
+            self.__urls = {
+                endpoint: value + endpoint
+                for endpoint in (Telemetry.endpoint, Event.endpoint,
+                                 Register.endpoint, CameraRegister.endpoint)
+            }
+        else:
+            self.__urls = {}
+
+    @property
+    def token(self):
+        """Returns the printer token for Connect."""
+        return self.__token
+
+    @token.setter
+    def token(self, value):
+        """Set the printer token."""
+        self.__token = value
+        self.__update_headers()
 
     @property
     def sn(self):
@@ -243,6 +318,7 @@ class Printer:
         if self.__sn is not None:
             raise RuntimeError("Serial number is already set.")
         self.__sn = value
+        self.__update_initialised()
 
     @property
     def type(self):
@@ -255,31 +331,51 @@ class Printer:
         if self.__type is not None:
             raise RuntimeError("Printer type is already set.")
         self.__type = value
+        self.__type_info = self.__get_type_info()
+        self.__update_initialised()
+        self.__update_headers()
+
+    def __update_initialised(self):
+        """Evaluates the initialised flag, when SN, fingerprint or type
+        changes."""
+        self.__initialised = bool(self.__sn and self.__fingerprint
+                                  and self.__type is not None)
 
     def is_initialised(self):
         """Returns True if the printer is initialised"""
-        initialised = bool(self.__sn and self.__fingerprint
-                           and self.__type is not None)
-        if not initialised:
-            errors.API.ok = False
-            API.state = CondState.NOK
-        return initialised
-
-    def make_headers(self, timestamp: Optional[float] = None) -> dict:
-        """Returns request headers from connection variables."""
-        timestamp = get_timestamp(timestamp)
+        if self.__initialised:
+            return True
+        errors.API.ok = False
+        API.state = CondState.NOK
+        return False
+
+    def __get_type_info(self):
+        """Returns the (type, version, subversion) tuple for INFO event."""
+        if self.__type is not None:
+            return self.__type.value
+        return (None, None, None)
 
+    def __update_headers(self):
+        """Prepares the request headers which change only with
+        the fingerprint, printer type or token."""
         headers = {
-            "Fingerprint": self.fingerprint,
-            "Timestamp": str(timestamp),
+            "Fingerprint": self.__fingerprint,
             "User-Agent": f"Prusa-Connect-SDK-Printer/{__version__}",
             "User-Agent-Printer": str(self.__type),
-            "User-Agent-Version": str(self.software or self.firmware),
         }
-        if self.token:
-            headers['Token'] = self.token
+        if self.__token:
+            headers['Token'] = self.__token
+        self.__headers = headers
+
+    def make_headers(self, timestamp: Optional[float] = None) -> dict:
+        """Returns request headers from connection variables."""
+        timestamp = get_timestamp(timestamp)
+
+        headers = self.__headers.copy()
+        headers["Timestamp"] = str(timestamp)
+        headers["User-Agent-Version"] = str(self.software or self.firmware)
 
-        if self.clock_watcher.clock_adjusted():
+        if self.clock_watcher.adjusted:
             log.debug("Clock adjustment detected. Resetting watcher")
             headers['Clock-Adjusted'] = "1"
             self.clock_watcher.reset()
@@ -304,6 +400,20 @@ class Printer:
         self.__state = state
         self.event_cb(const.Event.STATE_CHANGED, source, state=state, **kwargs)
 
+    def __add_job_ids(self, kwargs: Dict[str, Any]) -> bool:
+        """Adds the job and transfer ids to event or telemetry kwargs.
+
+        Returns True if there is a transfer running.
+        """
+        if self.job_id:
+            kwargs['job_id'] = self.job_id
+        transfer = self.transfer
+        # start_ts is a plain attribute and mostly 0, so check it first
+        if transfer.start_ts and transfer.in_progress:
+            kwargs['transfer_id'] = transfer.transfer_id
+            return True
+        return False
+
     def event_cb(self,
                  event: const.Event,
                  source: const.Source,
@@ -311,16 +421,13 @@ class Printer:
                  command_id: Optional[int] = None,
                  **kwargs) -> None:
         """Create event and push it to queue."""
-        if not self.token:
+        if not self.__token:
             log.debug("Skipping event, no token: %s", event.value)
             return
-        if self.job_id:
-            kwargs['job_id'] = self.job_id
-        if self.transfer.in_progress and self.transfer.start_ts:
-            kwargs['transfer_id'] = self.transfer.transfer_id
+        self.__add_job_ids(kwargs)
         if 'state' not in kwargs:
             kwargs['state'] = self.state
-        event_ = Event(event, source, timestamp, command_id, **kwargs)
+        event_ = Event.acquire(event, source, timestamp, command_id, **kwargs)
         log.debug("Putting event to queue: %s", event_)
         if not self.is_initialised():
             log.warning("Printer fingerprint and/or SN is not set")
@@ -333,23 +440,21 @@ class Printer:
         """Create telemetry end push it to queue."""
         if state:
             log.warning("State argument is deprecated. Use set_state method.")
-        if not self.token:
+        if not self.__token:
             log.debug("Skipping telemetry, no token.")
             return
         if self.command.state is not None:
             kwargs['command_id'] = self.command.command_id
-        if self.job_id:
-            kwargs['job_id'] = self.job_id
-        if self.transfer.in_progress and self.transfer.start_ts:
-            kwargs['transfer_id'] = self.transfer.transfer_id
-            kwargs['transfer_progress'] = self.transfer.progress
-            kwargs['transfer_time_remaining'] = self.transfer.time_remaining()
-            kwargs['transfer_transferred'] = self.transfer.transferred
-            kwargs['time_transferring'] = self.transfer.time_transferring()
+        if self.__add_job_ids(kwargs):
+            transfer = self.transfer
+            kwargs.update(transfer_progress=transfer.progress,
+                          transfer_time_remaining=transfer.time_remaining(),
+                          transfer_transferred=transfer.transferred,
+                          time_transferring=transfer.time_transferring())
         if self.is_initialised():
-            telemetry = Telemetry(self.__state, timestamp, **kwargs)
+            telemetry = Telemetry.acquire(self.__state, timestamp, **kwargs)
         else:
-            telemetry = Telemetry(self.__state, timestamp)
+            telemetry = Telemetry.acquire(self.__state, timestamp)
             log.warning("Printer fingerprint and/or SN is not set")
         self.queue.put(telemetry)
 
@@ -360,13 +465,13 @@ class Printer:
 
     def connection_from_config(self, path: str):
         """Loads connection details from config."""
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"ini file: `{path}` doesn't exist")
         config = configparser.ConfigParser()
-        config.read(path)
+        # read returns the list of successfully read files
+        if not config.read(path):
+            raise FileNotFoundError(f"ini file: `{path}` doesn't exist")
 
         host = config['service::connect']['hostname']
-        tls = config['service::connect'].getboolean('tls')
+        tls = config['service::connect'].getboolean('tls', fallback=False)
         port = config['service::connect'].getint('port', fallback=0)
 
         server = Printer.connect_url(host, tls, port)
@@ -389,10 +494,7 @@ class Printer:
         """Returns kwargs for Command.finish method as reaction
          to SEND_INFO."""
         # pylint: disable=unused-argument
-        if self.__type is not None:
-            type_, ver, sub = self.__type.value
-        else:
-            type_, ver, sub = (None, None, None)
+        type_, ver, sub = self.__type_info
 
         data = {
             "source": const.Source.CONNECT,
@@ -433,7 +535,7 @@ class Printer:
         in `caller`"""
         if not caller.kwargs:
             raise ValueError(
-                f"{const.Command.START_URL_DOWNLOAD} requires kwargs")
+                f"{const.Command.START_URL_DOWNLOAD.value} requires kwargs")
 
         try:
             retval = self.download_mgr.start(
@@ -446,15 +548,17 @@ class Printer:
             retval['source'] = const.Source.CONNECT
             return retval
         except KeyError as err:
-            raise ValueError(f"{const.Command.START_URL_DOWNLOAD} requires "
-                             f"kwarg {err}.") from None
+            raise ValueError(
+                f"{const.Command.START_URL_DOWNLOAD.value} requires "
+                f"kwarg {err}.") from None
 
     def start_connect_download(self, caller: Command) -> Dict[str, Any]:
         """Download a gcode from Connect, compose an URL using
         Connect config"""
         if not caller.kwargs:
             raise ValueError(
-                f"{const.Command.START_CONNECT_DOWNLOAD} requires kwargs")
+                f"{const.Command.START_CONNECT_DOWNLOAD.value} "
+                "requires kwargs")
 
         if not self.server:
             raise RuntimeError("Printer.server must be set!")
@@ -474,7 +578,7 @@ class Printer:
             return retval
         except KeyError as err:
             raise ValueError(
-                f"{const.Command.START_CONNECT_DOWNLOAD} requires "
+                f"{const.Command.START_CONNECT_DOWNLOAD.value} requires "
                 f"kwarg {err}.") from None
 
     def transfer_stop(self, caller: Command) -> Dict[str, Any]:
@@ -515,7 +619,8 @@ class Printer:
         """Process dialog action"""
         # pylint: disable=unused-argument
         if not caller.kwargs:
-            raise ValueError(f"{const.Command.DIALOG_ACTION} requires kwargs")
+            raise ValueError(
+                f"{const.Command.DIALOG_ACTION.value} requires kwargs")
         return {'source': const.Source.CONNECT}
 
     def get_file_info(self, caller: Command) -> Dict[str, Any]:
@@ -539,18 +644,15 @@ class Printer:
         }
 
         try:
-            path_ = os.path.split(self.fs.get_os_path(path))
-            if not path_[1].startswith("."):
-                meta = get_metadata(self.fs.get_os_path(path))
+            os_path = self.fs.get_os_path(path)
+            if not os.path.basename(os_path).startswith("."):
+                meta = get_metadata(os_path)
                 info.update(node.attrs)
                 info.update(meta.data)
 
                 # include the biggest thumbnail, if available
                 if meta.thumbnails:
-                    biggest = b""
-                    for _, data in meta.thumbnails.items():
-                        if len(data) > len(biggest):
-                            biggest = data
+                    biggest = max(meta.thumbnails.values(), key=len)
                     info['preview'] = biggest.decode()
         except FileNotFoundError:
             log.debug("File not found: %s", path)
@@ -649,14 +751,16 @@ class Printer:
         When response from connect is command (HTTP Status: 200 OK), it
         will set a command object, if the printer is initialized properly.
         """
-        if res.status_code == 200:
+        status = res.status_code
+        if status == 200:
+            headers = res.headers
             command_id: Optional[int] = None
             try:
-                command_id_string = res.headers.get("Command-Id", default="")
+                command_id_string = headers.get("Command-Id", default="")
                 command_id = int(command_id_string)
             except (TypeError, ValueError):
                 log.error("Invalid Command-Id header. Headers: %s",
-                          res.headers)
+                          headers)
                 self.event_cb(const.Event.REJECTED,
                               const.Source.CONNECT,
                               reason="Invalid Command-Id header")
@@ -667,11 +771,12 @@ class Printer:
                               command_id=command_id,
                               reason=self.NOT_INITIALISED_MSG)
                 return res
-            content_type = res.headers.get("content-type", default="")
-            log.debug("parse_command res: %s", res.text)
+            content_type = headers.get("content-type", default="")
+            if log.isEnabledFor(DEBUG):
+                log.debug("parse_command res: %s", res.text)
             try:
                 if content_type.startswith("application/json"):
-                    data = res.json()
+                    data = json_loads(res.content)
                     command_name = data.get("command", "")
                     if self.command.check_state(command_id, command_name):
                         self.command.accept(command_id,
@@ -681,11 +786,11 @@ class Printer:
                 elif content_type == "text/x.gcode":
                     command_name = const.Command.GCODE.value
                     if self.command.check_state(command_id, command_name):
-                        force = ("Force" in res.headers
-                                 and res.headers["Force"] == "1")
+                        force = headers.get("Force") == "1"
+                        gcode = res.text
                         self.command.accept(command_id,
-                                            command_name, [res.text],
-                                            {"gcode": res.text},
+                                            command_name, [gcode],
+                                            {"gcode": gcode},
                                             force=force)
                 else:
                     raise ValueError("Invalid command content type")
@@ -695,11 +800,11 @@ class Printer:
                               const.Source.CONNECT,
                               command_id=command_id,
                               reason=str(e))
-        elif res.status_code == 204:  # no cmd in telemetry
+        elif status == 204:  # no cmd in telemetry
             pass
         else:
             log.info("Got unexpected telemetry response (%s): %s",
-                     res.status_code, res.text)
+                     status, res.text)
         return res
 
     def register(self):
@@ -715,9 +820,11 @@ class Printer:
             "printer_type": str(self.__type),
             "firmware": self.firmware,
         }
-        res = self.conn.post(self.server + "/p/register",
-                             headers=self.make_headers(),
-                             json=data,
+        headers = self.make_headers()
+        headers["Content-Type"] = "application/json"
+        res = self.conn.post(self.__urls[Register.endpoint],
+                             headers=headers,
+                             data=json_dumps(data),
                              timeout=const.CONNECTION_TIMEOUT)
 
         if res.status_code != 200:
@@ -741,44 +848,96 @@ class Printer:
     def loop(self):
         """Calls loop_step in a loop. Handles any unexpected Exceptions"""
         self.__running_loop = True
+        # bound methods don't change between iterations, look them up once
+        clock_check = self.clock_watcher.check
+        camera_tick = self.camera_controller.tick
+        loop_step = self.loop_step
         while self.__running_loop:
+            clock_check()
             try:
-                self.camera_controller.tick()
+                camera_tick()
             # pylint: disable=broad-except
             except Exception:
                 log.exception(
                     "Unexpected exception from the camera module caught in"
                     " SDK loop!")
             try:
-                self.loop_step()
+                loop_step()
             # pylint: disable=broad-except
             except Exception:
                 log.exception("Unexpected exception caught in SDK loop!")
 
+    def get_item(self) -> LoopObject:
+        """Gets an item from the queue, or raises Empty.
+
+        With batching enabled, the queued Telemetry or Event objects
+        following the first one are coalesced into a single Batch. The first
+        item of a different kind ends the batch and is kept for the next call.
+
+        Each time the queue stays empty, the wait for the next item doubles
+        up to MAX_IDLE_TIMEOUT, any item resets it back. The wait never
+        exceeds the next poll of a pending registration.
+        """
+        polling = self.__polling
+        if self.__pending is not None:
+            item, self.__pending = self.__pending, None
+        elif polling and polling[0].next_poll <= monotonic():
+            return polling.pop(0)
+        else:
+            timeout = self.__idle_timeout
+            if polling:
+                timeout = max(0,
+                              min(timeout, polling[0].next_poll - monotonic()))
+            try:
+                item = self.queue.get(timeout=timeout)
+            except Empty:
+                self.__idle_timeout = min(self.__idle_timeout * 2,
+                                          const.MAX_IDLE_TIMEOUT)
+                raise
+            self.__idle_timeout = const.TIMESTAMP_PRECISION
+
+        if self.max_batch_size < 2 or not isinstance(item, (Telemetry, Event)):
+            return item
+
+        items: List[LoopObject] = [item]
+        while len(items) < self.max_batch_size:
+            try:
+                next_item = self.queue.get_nowait()
+            except Empty:
+                break
+            if type(next_item) is not type(item):
+                self.__pending = next_item
+                break
+            items.append(next_item)
+
+        if len(items) == 1:
+            return item
+        return Batch(items)
+
     def loop_step(self):
         """
         Gets an item LoopObject from queue, sends it and handles the response
         The LoopObject is either an Event - in which case it's just sent,
         a Telemetry, in which case the response might contain a command to
         execute, a Register object in which case the response contains the
-        credentials for further communication.
+        credentials for further communication. A Batch of telemetries is
+        handled the same way as a single Telemetry.
         """
-        # pylint: disable=too-many-branches
-        # pylint: disable=too-many-statements
         try:
             # Get the item to send
-            item = self.queue.get(timeout=const.TIMESTAMP_PRECISION)
+            item = self.get_item()
         except Empty:
             return
 
         # Make sure we're able to send it
-        if not self.server:
+        server = self.server
+        if not server:
             log.warning("Server is not set, skipping item: %s", item)
             return
         if not issubclass(type(item), LoopObject):
             log.warning("Enqueued an unknown item: %s", item)
             return
-        if item.needs_token and not self.token:
+        if item.needs_token and not self.__token:
             errors.TOKEN.ok = False
             TOKEN.state = CondState.NOK
             log.warning("No token, skipping item: %s", item)
@@ -787,7 +946,11 @@ class Printer:
         # Send it
         headers = self.make_headers(item.timestamp)
         try:
-            res = item.send(self.conn, self.server, headers)
+            res = item.send(self.conn,
+                            server,
+                            headers,
+                            url=self.__urls.get(item.endpoint),
+                            compress=self.compress_payloads)
         except ReadTimeoutError as err:
             errors.HTTP.ok = False
             HTTP.state = CondState.NOK
@@ -806,34 +969,49 @@ class Printer:
             log.exception('Unhandled error')
         else:
             # Handle the response
-            if isinstance(item, Telemetry):
-                self.parse_command(res)
-            elif isinstance(item, Register):
-                if res.status_code == 200:
-                    self.token = res.headers["Token"]
-                    errors.TOKEN.ok = True
-                    TOKEN.state = CondState.OK
-                    log.info("New token was set.")
-                    self.register_handler(self.token)
-                    self.code = None
-                elif res.status_code == 202 and item.timeout > time():
-                    self.queue.put(item)
-                    sleep(1)
-            elif isinstance(item, CameraRegister):
-                camera = item.camera
-                # pylint: disable=unused-argument
-                if res.status_code == 200:
-                    camera_token = res.headers["Token"]
-                    camera.set_token(camera_token)
-                else:
-                    log.warning(res.text)
+            handler = self.__response_handlers.get(item.kind)
+            if handler is not None:
+                handler(item, res)
 
-            self.deduce_state_from_code(res.status_code)
-            if res.status_code > 400:
+            status = res.status_code
+            self.deduce_state_from_code(status)
+            if status > 400:
                 log.warning(res.text)
-            elif res.status_code == 400:
+            elif status == 400 and log.isEnabledFor(DEBUG):
                 log.debug(res.text)
 
+        # Telemetry and Event objects are recycled once sent
+        item.release()
+
+    def __telemetry_response(self, item: Telemetry, res: Response):
+        """Telemetry response can contain a command"""
+        # pylint: disable=unused-argument
+        self.parse_command(res)
+
+    def __register_response(self, item: Register, res: Response):
+        """Register response contains the token once the printer
+        is registered"""
+        if res.status_code == 200:
+            self.token = res.headers["Token"]
+            errors.TOKEN.ok = True
+            TOKEN.state = CondState.OK
+            log.info("New token was set.")
+            self.register_handler(self.token)
+            self.code = None
+        elif res.status_code == 202 and item.timeout > time():
+            # Ask again later, without blocking the other items
+            item.next_poll = monotonic() + const.REGISTER_POLL_INTERVAL
+            self.__polling.append(item)
+
+    @staticmethod
+    def __camera_register_response(item: CameraRegister, res: Response):
+        """Camera register response contains the camera token"""
+        if res.status_code == 200:
+            camera_token = res.headers["Token"]
+            item.camera.set_token(camera_token)
+        else:
+            log.warning(res.text)
+
     @staticmethod
     def deduce_state_from_code(status_code):
         """Deduce our state from the HTTP status code"""
@@ -2,12 +2,11 @@
 Snapshot and Resolution"""
 
 import logging
-from copy import deepcopy
 import os
 from pathlib import Path
 from threading import Event
 from time import time
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, Optional, Tuple
 
 from requests import Session  # type: ignore
 
@@ -89,7 +88,8 @@ class Snapshot:
                            data=self.data,
                            timeout=CONNECTION_TIMEOUT)
 
-        log.debug("%s response: %s", name, res.text)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s response: %s", name, res.text)
         return res
 
     def save(self, save_directory: str, file_base_name: str = None):
@@ -249,7 +249,7 @@ class Camera:
     def __init__(self, driver):
         self._trigger_scheme = None
         self._resolution = None
-        self._available_resolutions = {}
+        self._available_resolutions: Tuple[Resolution, ...] = ()
         self._rotation = 0
         self._exposure = 0.0
         self._focus = 0.0
@@ -277,7 +277,7 @@ class Camera:
             self._available_resolutions = self._driver.available_resolutions
 
         # - Initial settings -
-        initial_settings = deepcopy(DEFAULT_CAMERA_SETTINGS)
+        initial_settings = dict(DEFAULT_CAMERA_SETTINGS)
 
         config = self._driver.config
         driver_settings = self.settings_from_string(config)
@@ -476,6 +476,11 @@ class Camera:
         """Gets the camera's last photo it has taken (can be None)"""
         return self._driver.last_snapshot
 
+    @property
+    def last_snapshot_view(self):
+        """Gets the data of the last photo without copying (can be None)"""
+        return self._driver.last_snapshot_view
+
     @property
     def output_resolution(self):
         """Returns the expected resolution of the output image"""
@@ -486,8 +491,8 @@ class Camera:
         return self.resolution
 
     @property
-    def available_resolutions(self) -> Set[Resolution]:
-        """Gets the camera's available resolutions"""
+    def available_resolutions(self) -> Tuple[Resolution, ...]:
+        """Gets the camera's available resolutions, smallest first"""
         return self._available_resolutions
 
     def supports(self, cap_type):
@@ -1,7 +1,6 @@
 """Implements the camera config management class"""
 import logging
 from configparser import ConfigParser
-from copy import deepcopy
 from multiprocessing import RLock
 from typing import Dict, List, Set, Tuple, Type
 
@@ -251,7 +250,11 @@ class CameraConfigurator:
 
         If we detect a camera with the same ID we update its config,
         for example path, to reflect this change"""
-        config_dict = deepcopy(config_dict)
+        # Only the configs get changed, their string values don't
+        config_dict = {
+            camera_id: dict(config)
+            for camera_id, config in config_dict.items()
+        }
         for camera_id, config in detected_configs.items():
             if camera_id not in config_dict:
                 config_dict[camera_id] = config
@@ -202,7 +202,8 @@ class CameraController:
                     self.get_camera(item.camera_id).set_token(None)
                 if res.status_code > 400:
                     log.warning(res.text)
-                elif res.status_code == 400:
+                elif res.status_code == 400 and log.isEnabledFor(
+                        logging.DEBUG):
                     log.debug(res.text)
             except Empty:
                 continue
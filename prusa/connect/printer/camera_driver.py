@@ -1,12 +1,19 @@
 """Implementation of the base CameraDriver"""
 
-import base64
+import binascii
 import hashlib
 import logging
-from copy import deepcopy
-from threading import Thread
+from functools import lru_cache
+from threading import Event, Thread, current_thread
 from types import MappingProxyType
-from typing import Callable, Dict, Iterable, Optional, Set
+from typing import (
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Optional,
+    Tuple,
+)
 
 from . import get_timestamp
 from .camera import Resolution, Snapshot
@@ -14,6 +21,11 @@ from .const import ALWAYS_REQURIED, CameraConfigs, CapabilityType, ConfigError
 
 log = logging.getLogger("camera_driver")
 
+# Initialized once, make_hash works on its copies
+BLAKE2B_TEMPLATE = hashlib.blake2b(digest_size=9)
+# Turns standard base64 into the url safe alphabet
+URLSAFE_TRANS = bytes.maketrans(b"+/", b"-_")
+
 
 def not_implemented(driver, setting_name):
     """The default implementation for drivers, so any non-overriden methods
@@ -33,10 +45,30 @@ class CameraDriver:
     """
 
     # A driver name
-    name: str
+    name: ClassVar[str]
     # Keys are the keys of the dictionary needed to instance the driver
     # Values are human-readable hints.
     REQUIRES_SETTINGS: MappingProxyType[str, str] = MappingProxyType({})
+    # Filled by get_required_settings for each driver class separately
+    _required_settings: ClassVar[Optional[FrozenSet[str]]] = None
+
+    # Drivers can define their own __slots__ to drop the instance dict too
+    __slots__ = (
+        "_available_resolutions",
+        "_camera_id",
+        "_capabilities",
+        "_config",
+        "_connected",
+        "_last_snapshot",
+        "_photo_thread",
+        "_snapshot",
+        "_stop_event",
+        "_trigger_event",
+        "_trigger_timestamp",
+        "disconnected_cb",
+        "photo_cb",
+        "store_cb",
+    )
 
     def __init__(self, camera_id: str, config: Dict[str, str],
                  disconnected_cb: Callable[["CameraDriver"], None]) -> None:
@@ -50,17 +82,26 @@ class CameraDriver:
         self.disconnected_cb = disconnected_cb
         self.store_cb: Callable[[str], None] = lambda camera_id: None
 
+        # Photos are taken one at a time by a long-lived thread waiting
+        # for the trigger event, _snapshot is the one being taken
         self._photo_thread: Optional[Thread] = None
+        self._trigger_event = Event()
+        self._stop_event = Event()
+        self._snapshot: Optional[Snapshot] = None
+        # When the photo being taken was requested, see trigger_timestamp
+        self._trigger_timestamp: Optional[float] = None
         self._camera_id = camera_id
         self._config = config
 
-        if not hasattr(self, "name"):
+        if getattr(type(self), "name", None) is None:
             raise ValueError("Name your driver - redefine class var 'name'")
 
         self._connected = False
 
-        self._capabilities: Set[CapabilityType] = set()
-        self._available_resolutions: Set[Resolution] = set()
+        # Drivers fill these in _connect, connect then freezes them
+        # and sorts the resolutions, so the properties don't need to copy
+        self._capabilities: FrozenSet[CapabilityType] = frozenset()
+        self._available_resolutions: Tuple[Resolution, ...] = ()
         # For web to show a preview even if the camera does not work right now
         self._last_snapshot: Optional[Snapshot] = None
 
@@ -76,6 +117,9 @@ class CameraDriver:
                               "or are incorrect")
         try:
             self._connect()
+            self._capabilities = frozenset(self._capabilities)
+            self._available_resolutions = tuple(
+                sorted(self._available_resolutions))
         except Exception:  # pylint: disable=broad-except
             log.exception("Initialization of camera %s has failed",
                           self.config.get("name", "unknown"))
@@ -95,38 +139,47 @@ class CameraDriver:
         return configured_resolution
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def make_hash(plaintext_id: str) -> str:
-        """Hashes the camera ID"""
-        hashed_id = hashlib.blake2b(plaintext_id.encode("latin-1"),
-                                    digest_size=9).digest()
-        return base64.urlsafe_b64encode(hashed_id).decode()
+        """Hashes the camera ID, the same IDs come up on every scan"""
+        hasher = BLAKE2B_TEMPLATE.copy()
+        hasher.update(plaintext_id.encode("latin-1"))
+        # 9 bytes encode to 12 characters without padding
+        encoded = binascii.b2a_base64(hasher.digest(), newline=False)
+        return encoded.translate(URLSAFE_TRANS).decode("ascii")
 
     @classmethod
     def scan(cls) -> CameraConfigs:
         """Returns available cameras as a dictionary,
         where the key is the camera's ID and the value contains a dictionary
         with config options needed to instance such a camera"""
-        valid = {}
         try:
             available = cls._scan()
         except Exception:  # pylint: disable=broad-except
             log.exception("Error while scanning for %s cameras", cls.name)
-        else:
-            for plaintext_id, config in available.items():
-                camera_id = CameraDriver.make_hash(plaintext_id)
-
-                # Fill in this required config option for all drivers
-                if "driver" not in config:
-                    config["driver"] = cls.name
-
-                if "trigger_scheme" in config:
-                    log.warning("Camera drivers are not supposed to specify "
-                                "trigger scheme")
+            return {}
+        return dict(
+            filter(None, (cls._prepare_scanned(plaintext_id, config)
+                          for plaintext_id, config in available.items())))
 
-                if not cls.is_config_valid(config):
-                    continue
-                valid[camera_id] = config
-        return valid
+    @classmethod
+    def _prepare_scanned(
+            cls, plaintext_id: str,
+            config: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Completes a scanned config, returns it with the hashed camera ID,
+        or None if the config is not valid"""
+        # Fill in this required config option for all drivers
+        if "driver" not in config:
+            config["driver"] = cls.name
+
+        if "trigger_scheme" in config:
+            log.warning("Camera drivers are not supposed to specify "
+                        "trigger scheme")
+
+        if not cls.is_config_valid(config):
+            return None
+        # Hash only the ids of cameras that are going to be used
+        return CameraDriver.make_hash(plaintext_id), config
 
     @staticmethod
     def _scan() -> CameraConfigs:
@@ -137,12 +190,14 @@ class CameraDriver:
         return {}
 
     @classmethod
-    def get_required_settings(cls) -> Set[str]:
+    def get_required_settings(cls) -> FrozenSet[str]:
         """Returns the sum of always required and driver specific
         config options"""
-        required: Set[str] = set()
-        required.update(ALWAYS_REQURIED)
-        required.update(cls.REQUIRES_SETTINGS)
+        # Not inherited, subclasses can require different settings
+        required = cls.__dict__.get("_required_settings")
+        if required is None:
+            required = frozenset(ALWAYS_REQURIED).union(cls.REQUIRES_SETTINGS)
+            cls._required_settings = required
         return required
 
     @classmethod
@@ -167,9 +222,8 @@ class CameraDriver:
         Log failures, don't throw if possible,
         rather just call _disconnected()
         """
-        required: Set[str] = cls.get_required_settings()
-        missing_settings = required - set(config)
-        if missing_settings:
+        missing_settings = cls.get_required_settings() - config.keys()
+        if missing_settings and log.isEnabledFor(logging.WARNING):
             log.warning("The camera driver %s is missing these settings %s",
                         cls.name, ", ".join(missing_settings))
         return not missing_settings
@@ -182,6 +236,7 @@ class CameraDriver:
             log.exception(
                 "Driver %s for a camera %s threw an error while "
                 "disconnecting", self.name, self.camera_id)
+        self._stop_photographer()
         if self._connected:
             # If we got stuck taking a photo and are returning late, the
             # driver is already stopped, so we must not call the disconnected
@@ -219,31 +274,86 @@ class CameraDriver:
         not_implemented(self, "focus")
 
     def trigger(self, snapshot: Optional[Snapshot] = None) -> None:
-        """This method is not allowed to block, it just
-        creates a new thread and runs it"""
+        """This method is not allowed to block, it just wakes up the
+        photographer thread. A trigger arriving while the previous photo
+        is still being taken is skipped"""
+        if self._snapshot is not None:
+            log.warning("Camera %s is still taking a photo, skipping trigger",
+                        self.camera_id)
+            return
         if snapshot is None:
             snapshot = Snapshot()
             snapshot.camera_id = self.camera_id
-        self._photo_thread = Thread(target=self._photo_taker,
-                                    args=(snapshot, ),
-                                    name="Photographer",
-                                    daemon=True)
-        self._photo_thread.start()
-
-    def _photo_taker(self, snapshot: Snapshot) -> None:
-        """The thread target, calls the blocking photo taking method and
-        catches errors. If a camera errors out while taking a photo it's
-        considered disconnected"""
+        self._trigger_timestamp = get_timestamp()
+        self._snapshot = snapshot
+        if self._photo_thread is None:
+            # Each thread gets its own events, so one that is stuck taking
+            # a photo can't take over from its replacement
+            self._trigger_event = Event()
+            self._stop_event = Event()
+            self._photo_thread = Thread(target=self._photographer,
+                                        args=(self._trigger_event,
+                                              self._stop_event),
+                                        name="Photographer",
+                                        daemon=True)
+            self._photo_thread.start()
+        self._trigger_event.set()
+
+    def _photographer(self, trigger_event: Event, stop_event: Event) -> None:
+        """The thread target, takes a photo each time it gets triggered,
+        until it's told to stop"""
+        try:
+            while True:
+                trigger_event.wait()
+                trigger_event.clear()
+                if stop_event.is_set():
+                    return
+                snapshot = self._snapshot
+                if snapshot is None:
+                    continue
+                try:
+                    self._photo_taker(snapshot, stop_event)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception(
+                        "Handling a photo from camera %s failed",
+                        self.camera_id)
+        finally:
+            # Should we end unexpectedly, let the next trigger start over
+            if self._photo_thread is current_thread():
+                self._photo_thread = None
+                self._snapshot = None
+
+    def _stop_photographer(self) -> None:
+        """Lets the photographer thread end, a new one is started
+        on the next trigger"""
+        if self._photo_thread is not None:
+            self._stop_event.set()
+            self._trigger_event.set()
+            self._photo_thread = None
+        self._snapshot = None
+
+    def _photo_taker(self, snapshot: Snapshot, stop_event: Event) -> None:
+        """Calls the blocking photo taking method and catches errors.
+        If a camera errors out while taking a photo it's considered
+        disconnected. A photographer stopped in the meantime drops
+        its result, it has been replaced already"""
         try:
             snapshot.data = self.take_a_photo()
         except Exception:  # pylint: disable=broad-except
+            if stop_event.is_set():
+                return
             log.exception(
                 "The driver %s broke while taking a photo. "
                 "Disconnecting", self.name)
             self.disconnect()
         else:
+            if stop_event.is_set():
+                return
             snapshot.timestamp = get_timestamp()
             self._last_snapshot = snapshot
+            # Done, the callback may already trigger another photo
+            if self._snapshot is snapshot:
+                self._snapshot = None
             self.photo_cb(snapshot)
 
     def take_a_photo(self) -> bytes:
@@ -276,27 +386,47 @@ class CameraDriver:
         """
         return self._last_snapshot
 
+    @property
+    def last_snapshot_view(self) -> Optional[memoryview]:
+        """
+        Returns a memoryview of the last photo data, so it can be sliced
+        or written out without copying it - None if there's no photo
+        """
+        snapshot = self._last_snapshot
+        if snapshot is None or snapshot.data is None:
+            return None
+        return memoryview(snapshot.data)
+
+    @property
+    def trigger_timestamp(self) -> Optional[float]:
+        """
+        Returns when the last photo was requested, drivers can use it in
+        take_a_photo instead of getting the time again - None by default
+        """
+        return self._trigger_timestamp
+
     @property
     def camera_id(self) -> str:
         """Returns the camera_id from settings"""
         return self._camera_id
 
     @property
-    def capabilities(self) -> Iterable[CapabilityType]:
+    def capabilities(self) -> FrozenSet[CapabilityType]:
         """
         The capabilities supported by the device
         The minimum is supporting TRIGGER_SCHEME (ability to trigger a camera)
         """
-        return deepcopy(self._capabilities)
+        return self._capabilities
 
     @property
-    def available_resolutions(self) -> Iterable[Resolution]:
-        """Returns the available resolutions of the camera"""
-        return deepcopy(self._available_resolutions)
+    def available_resolutions(self) -> Tuple[Resolution, ...]:
+        """Returns the available resolutions of the camera, smallest first"""
+        return self._available_resolutions
 
     @property
     def config(self) -> Dict[str, str]:
         """
         A dictionary with all the supported camera setting defaults
+        The values are strings, so a shallow copy is enough
         """
-        return deepcopy(self._config)
+        return dict(self._config)
@@ -12,17 +12,27 @@ class ClockWatcher:
     It assumes that the system clock has been adjusted if
     ``start_time - hw_clock_time`` is different from current values outside the
     `ClockWatcher.TOLERANCE`.
+
+    The check is meant to run periodically using `check`, which raises
+    the `adjusted` flag until the next `reset`.
     """
 
     TOLERANCE = 1  # seconds
 
     def __init__(self):
         self.delta = 0
+        self.adjusted = False
         self.reset()
 
     def reset(self):
-        """Reset the measured delta"""
+        """Reset the measured delta and the adjusted flag"""
         self.delta = time.time() - time.monotonic()
+        self.adjusted = False
+
+    def check(self):
+        """Set the adjusted flag if the clock has been adjusted"""
+        if not self.adjusted and self.clock_adjusted():
+            self.adjusted = True
 
     def clock_adjusted(self):
         """Check if the clock has been adjusted on the system"""
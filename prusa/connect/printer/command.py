@@ -51,8 +51,8 @@ class Command:
         Otherwise, put right event to queue.
         """
         try:
-            command_enum = const.Command(command_name)
-            if command_enum in PRIORITY_COMMANDS:
+            # Command members are equal to their names, no lookup needed
+            if command_name in PRIORITY_COMMANDS:
                 self.stop_cb()
                 if not self.cmd_end_evt.wait(ONE_SECOND_TIMEOUT):
                     log.warning(
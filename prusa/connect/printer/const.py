@@ -6,10 +6,15 @@ TIMESTAMP_PRECISION = 0.1  # 100ms
 CONNECTION_TIMEOUT = 10  # 10s
 CAMERA_WAIT_TIMEOUT = 3  # 3s
 ONE_SECOND_TIMEOUT = 1  # 1s
+MAX_IDLE_TIMEOUT = 1  # 1s, longest wait for the queue when there is no data
+REGISTER_POLL_INTERVAL = 1  # 1s
 GCODE_EXTENSIONS = (".gcode", ".gc", ".g", ".gco")
 FIRMWARE_EXTENSION = ".hex"
 SL_EXTENSIONS = (".sl1", )
 CAMERA_BUSY_TIMEOUT = 20  # 20s
+POOL_CONNECTIONS = 4  # number of hosts to keep connection pools for
+POOL_MAXSIZE = 16  # connections kept alive per host
+COMPRESS_MIN_SIZE = 1024  # bytes, smaller payloads are sent as they are
 
 # Maximum length of filename, including .gcode suffix
 FILENAME_LENGTH = 248
@@ -21,7 +26,7 @@ MAX_NAME_LENGTH = 255
 FORBIDDEN_CHARACTERS = ('\\', '?', '"', '%', '¯', '°', '#', 'ˇ')
 
 
-class State(Enum):
+class State(str, Enum):
     """Printer could be in one of this state."""
     IDLE = "IDLE"
     BUSY = "BUSY"
@@ -77,7 +82,7 @@ class StorageType(Enum):
     USB = 'USB'
 
 
-class Event(Enum):
+class Event(str, Enum):
     """Events known by Connect."""
     ACCEPTED = "ACCEPTED"
     REJECTED = "REJECTED"
@@ -102,7 +107,7 @@ class Event(Enum):
     SLOT_EVENT = "SLOT_EVENT"
 
 
-class Source(Enum):
+class Source(str, Enum):
     """Printer event source."""
     CONNECT = "CONNECT"
     GUI = "GUI"
@@ -116,7 +121,7 @@ class Source(Enum):
     SLOT = "SLOT"
 
 
-class Command(Enum):
+class Command(str, Enum):
     """Commands which could be sent by Connect."""
     SEND_INFO = "SEND_INFO"
     GCODE = "GCODE"
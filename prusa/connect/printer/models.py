@@ -1,14 +1,23 @@
 """Connect printer data models."""
-from logging import getLogger
+import gzip
+from logging import DEBUG, getLogger
 from time import time
-from typing import Any, Callable, Dict, Optional, TypedDict
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    TypedDict,
+)
 
 from mypy_extensions import Arg, DefaultArg, KwArg
 from requests import Session  # type: ignore
 
 from . import const
 from .camera import Camera
-from .util import get_timestamp
+from .util import get_timestamp, json_dumps
 
 # NOTE: Temporary for pylint with python3.9
 # pylint: disable=unsubscriptable-object
@@ -16,6 +25,7 @@ from .util import get_timestamp
 log = getLogger("connect-printer")
 
 CODE_TIMEOUT = 60 * 30  # 30 min
+POOL_SIZE = 128  # max number of recycled objects kept per class
 
 EventCallback = Callable[[
     Arg(const.Event, 'event'),  # noqa
@@ -59,26 +69,86 @@ class LoopObject:
 
     timestamp: float
 
+    # Sent objects of classes defining their own pool list are kept for
+    # reuse, the pool is not inherited, so subclasses are not mixed in
+    _pool: ClassVar[Optional[List["LoopObject"]]] = None
+
     def __init__(self, timestamp: Optional[float] = None):
         self.timestamp = get_timestamp(timestamp)
 
-    def send(self, conn: Session, server, headers):
-        """A universal send function"""
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        """Returns a new object, recycled from the pool if possible"""
+        obj = None
+        pool = cls.__dict__.get("_pool")
+        if pool:
+            try:
+                # list.pop is atomic, no need to lock for other producers
+                obj = pool.pop()
+            except IndexError:
+                pass
+        if obj is None:
+            return cls(*args, **kwargs)
+        # pylint: disable=unnecessary-dunder-call
+        obj.__init__(*args, **kwargs)  # type: ignore
+        return obj
+
+    @property
+    def kind(self):
+        """Returns the class of the sent object(s)"""
+        return type(self)
+
+    def release(self):
+        """Returns the already sent object to the pool of its class.
+        It must not be used after that."""
+        pool = type(self).__dict__.get("_pool")
+        if pool is not None and len(pool) < POOL_SIZE:
+            self._reset()
+            pool.append(self)
+
+    def _reset(self):
+        """Drops the references to the payload of a pooled object,
+        so it does not keep them alive until it is reused"""
+
+    def send(self, conn: Session, server, headers, url=None, compress=False):
+        """A universal send function
+
+        url : str
+            The request url if already known, otherwise it is composed
+            of server and endpoint.
+        compress : bool
+            Send payloads bigger than COMPRESS_MIN_SIZE gzip compressed.
+        """
         name = self.__class__.__name__
         log.debug("Sending %s: %s", name, self)
+        data = self.to_json()
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+            if compress and len(data) > const.COMPRESS_MIN_SIZE:
+                data = gzip.compress(data, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
         res = conn.request(method=self.method,
-                           url=server + self.endpoint,
+                           url=url or server + self.endpoint,
                            headers=headers,
-                           json=self.to_payload(),
+                           data=data,
                            timeout=const.CONNECTION_TIMEOUT)
 
-        log.debug("%s response: %s", name, res.text)
+        if log.isEnabledFor(DEBUG):
+            log.debug("%s response: %s", name, res.text)
         return res
 
     def to_payload(self):
         """By default, LoopObjects don't send any payload"""
         return None
 
+    def to_json(self) -> Optional[bytes]:
+        """Returns the payload serialized to JSON, or None without payload"""
+        # pylint: disable=assignment-from-none
+        payload = self.to_payload()
+        if payload is None:
+            return None
+        return json_dumps(payload)
+
 
 class Register(LoopObject):
     """A request to Connect to register the printer
@@ -92,11 +162,14 @@ class Register(LoopObject):
         super().__init__()
         self.code = code
         self.timeout = int(time()) + CODE_TIMEOUT
+        # When to ask Connect again, while the registration is pending,
+        # a time.monotonic() value, so clock changes don't affect it
+        self.next_poll = 0.0
 
-    def send(self, conn: Session, server, headers):
+    def send(self, conn: Session, server, headers, url=None, compress=False):
         """Register needs an extra code in the headers, this adds it"""
         headers["Code"] = self.code
-        return super().send(conn, server, headers)
+        return super().send(conn, server, headers, url, compress)
 
 
 # pylint: disable=too-many-instance-attributes
@@ -115,6 +188,7 @@ class Event(LoopObject):
     method = "POST"
     needs_token = True
     data: Dict[str, Any]
+    _pool: ClassVar[List["LoopObject"]] = []
 
     # pylint: disable=too-many-arguments
     def __init__(self,
@@ -139,11 +213,14 @@ class Event(LoopObject):
         self.dialog_id = dialog_id
         self.data = kwargs
 
+    def _reset(self):
+        self.data = {}
+
     def to_payload(self):
         """Send event to connect."""
         data = {
-            "event": self.event.value,
-            "source": self.source.value,
+            "event": self.event,
+            "source": self.source,
             "data": filter_null(self.data),
         }
         for attr in ('command_id',
@@ -155,14 +232,21 @@ class Event(LoopObject):
             if value:
                 data[attr] = value
         if self.state:
-            data["state"] = self.state.value
+            data["state"] = self.state
 
         return data
 
     def __repr__(self):
         data = self.to_payload()
-        return (f"<Event::{self.event} at {id(self)}>"
-                f" [{self.source}], {data}")
+        return (f"<Event::{self.event.value} at {id(self)}>"
+                f" [{self.source.value}], {data}")
+
+
+# Serialized bodies of telemetries reporting nothing but the printer state
+STATE_TELEMETRY_JSON = {
+    state: json_dumps({"state": state})
+    for state in const.State
+}
 
 
 class Telemetry(LoopObject):
@@ -171,6 +255,7 @@ class Telemetry(LoopObject):
     endpoint = "/p/telemetry"
     method = "POST"
     needs_token = True
+    _pool: ClassVar[List["LoopObject"]] = []
 
     def __init__(self,
                  state: const.State,
@@ -182,16 +267,65 @@ class Telemetry(LoopObject):
         """
         super().__init__(timestamp=timestamp)
         self.__data = kwargs
-        self.__data['state'] = state.value
+        self.__data['state'] = state
+
+    def _reset(self):
+        self.__data = {}
 
     def to_payload(self):
         """Returns telemetry payload data"""
         return filter_null(self.__data)
 
+    def to_json(self) -> Optional[bytes]:
+        """Telemetry with just the state is the most common one,
+        its body is serialized in advance"""
+        if len(self.__data) == 1:
+            data = STATE_TELEMETRY_JSON.get(self.__data["state"])
+            if data is not None:
+                return data
+        return super().to_json()
+
     def __repr__(self):
         return f"<Telemetry:: at {id(self)}> {self.__data}"
 
 
+class Batch(LoopObject):
+    """Consecutive Telemetry or Event objects sent out in a single request.
+
+    The payload is a list of the item payloads, each one extended with its
+    own timestamp, the request headers use the newest one.
+    """
+
+    method = "POST"
+    needs_token = True
+
+    def __init__(self, items: List[LoopObject]):
+        super().__init__(timestamp=items[-1].timestamp)
+        self.items = items
+        self.endpoint = items[0].endpoint
+
+    @property
+    def kind(self):
+        """Returns the class of the batched objects"""
+        return type(self.items[0])
+
+    def release(self):
+        """Releases all the items of the batch"""
+        for item in self.items:
+            item.release()
+
+    def to_payload(self):
+        """Returns the list of item payloads"""
+        return [
+            dict(item.to_payload(), timestamp=item.timestamp)
+            for item in self.items
+        ]
+
+    def __repr__(self):
+        return (f"<Batch::{self.kind.__name__} at {id(self)}>"
+                f" {len(self.items)} items")
+
+
 class CameraRegister(LoopObject):
     """A request to Connect to register the camera"""
     endpoint = "/p/camera"
@@ -1,17 +1,48 @@
 """Various utilities for the Printer SDK project"""
 
+import json
 import logging
 from hashlib import sha256
 from time import time
-from typing import Optional
+from typing import Any, Optional
 
 import requests  # type: ignore
 
 from . import const
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None  # type: ignore
+
 log = logging.getLogger("connect-printer")
 
 
+def json_dumps(obj: Any) -> bytes:
+    """Serializes obj to JSON bytes, using orjson if it is installed.
+
+    >>> json_dumps({"state": "IDLE", "slots": {1: None}})
+    b'{"state":"IDLE","slots":{"1":null}}'
+    """
+    # pylint: disable=no-member
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    """Deserializes JSON bytes, using orjson if it is installed.
+
+    >>> json_loads(b'{"command": "SEND_INFO"}')
+    {'command': 'SEND_INFO'}
+    """
+    # pylint: disable=no-member
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def get_timestamp(timestamp: Optional[float] = None):
     """If given None, gets the current timestamp, otherwise leaves the
     value alone"""
@@ -56,6 +87,7 @@ class RetryingSession(requests.Session):
     def get(self, *args, **kw):
         return self.call_and_retry(super().get, *args, **kw)
 
+    # pylint: disable=redefined-outer-name
     def post(self, url, data=None, json=None, **kw):
         kw['data'] = data
         kw['json'] = json
@@ -172,6 +172,8 @@ class EventSetMock(Mock):
 def test_humpty_function():
     # Humpty tries to return configs, only one of them has everything needed
     available = DummyDriver.scan()
+    # the hashes are stored in configs, they must never change
+    assert CameraDriver.make_hash("id0") == "qeOq-QdDzJa5"
     id1 = CameraDriver.make_hash("id1")
     id2 = CameraDriver.make_hash("id2")
     id3 = CameraDriver.make_hash("id3")
@@ -186,6 +188,9 @@ def test_humpty_function():
         camera = Camera(driver)
     driver = DummyDriver(id1, available[id1], Mock())
     driver.connect()
+    assert driver.available_resolutions == (Resolution(3, 3),
+                                            Resolution(5, 5))
+    assert driver.capabilities is driver.capabilities
     camera = Camera(driver)
     expected = {
         CapabilityType.TRIGGER_SCHEME,
@@ -227,7 +232,7 @@ def test_humpty_function():
 
     driver = DummyDriver(id1, available[id1], Mock())
     driver.connect()
-    driver._capabilities.add(CapabilityType.EXPOSURE)
+    driver._capabilities |= {CapabilityType.EXPOSURE}
     with raises(DriverError):
         camera = Camera(driver)
         camera.exposure = 1
@@ -251,10 +256,95 @@ def test_humpty_function():
         }, Mock())
     driver.connect()
     assert driver.is_connected
-    driver._photo_taker(Snapshot())
+    driver._photo_taker(Snapshot(), Event())
     driver.disconnected_cb.assert_called_once()
 
 
+def test_last_snapshot_view():
+    camera_id, config = GoodDriver.scan().popitem()
+    driver = GoodDriver(camera_id, config, Mock())
+    driver.connect()
+    assert driver.last_snapshot_view is None
+    photo = b"photo_data"
+    driver.take_a_photo = lambda: photo
+    driver._photo_taker(Snapshot(), Event())
+
+    view = driver.last_snapshot_view
+    assert view.obj is photo
+    assert bytes(view[:5]) == b"photo"
+    assert Camera(driver).last_snapshot_view == photo
+
+
+def test_nameless_driver():
+    class NamelessDriver(CameraDriver):
+        """Forgot to name itself"""
+
+    with raises(ValueError):
+        NamelessDriver("nameless", {}, Mock())
+
+
+def test_trigger_in_flight():
+    driver = GoodDriver("slow", {
+        "name": "Slowpoke",
+        "driver": "GigaChad",
+    }, Mock())
+    driver.connect()
+    shutter = Event()
+    driver.take_a_photo = lambda: shutter.wait(1) and "photo_data"
+    driver.photo_cb = EventSetMock()
+
+    assert driver.trigger_timestamp is None
+    driver.trigger()
+    triggered_at = driver.trigger_timestamp
+    assert triggered_at is not None
+    # the first photo is not taken yet, this one is skipped
+    driver.trigger()
+    assert driver.trigger_timestamp == triggered_at
+    shutter.set()
+    driver.photo_cb.event.wait(1)
+    driver.photo_cb.assert_called_once()
+    assert driver.last_snapshot.data == "photo_data"
+
+    driver.photo_cb = EventSetMock()
+    driver.trigger()
+    driver.photo_cb.event.wait(1)
+    driver.photo_cb.assert_called_once()
+
+    photographer = driver._photo_thread
+    driver.disconnect()
+    photographer.join(1)
+    assert not photographer.is_alive()
+
+
+def test_photo_cb_error():
+    driver = GoodDriver("broken_cb", {
+        "name": "Butterfingers",
+        "driver": "GigaChad",
+    }, Mock())
+    driver.connect()
+    driver.take_a_photo = lambda: "photo_data"
+    dropped = Event()
+
+    def butterfingers(_):
+        dropped.set()
+        raise RuntimeError("Dropped it")
+
+    driver.photo_cb = butterfingers
+    driver.trigger()
+    photographer = driver._photo_thread
+    assert dropped.wait(1)
+    # the failed callback must not take the photographer down with it
+    photographer.join(0.2)
+    assert photographer.is_alive()
+
+    driver.photo_cb = EventSetMock()
+    driver.trigger()
+    assert driver.photo_cb.event.wait(1)
+    driver.photo_cb.assert_called_once()
+    assert driver._photo_thread is photographer
+    driver.disconnect()
+
+
 def test_configurator_from_config():
     id1 = CameraDriver.make_hash("id1")
     config = ConfigParser()
@@ -363,7 +453,7 @@ def test_configurator_auto_add():
     assert "abc" in configurator.loaded
     # Do not use trigger, that creates a thread and we do not want to deal
     # with synchronization in the tests
-    configurator.loaded["abc"]._photo_taker(Snapshot())
+    configurator.loaded["abc"]._photo_taker(Snapshot(), Event())
     assert "abc" not in configurator.camera_controller
     assert not configurator.is_connected("abc")
 
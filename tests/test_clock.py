@@ -20,6 +20,19 @@ def test_clock_adjusted():
     assert not adj_watcher.clock_adjusted()
 
 
+def test_check():
+    adj_watcher = ClockWatcher()
+    adj_watcher.check()
+    assert not adj_watcher.adjusted
+
+    adjust_clock(adj_watcher)
+    adj_watcher.check()
+    assert adj_watcher.adjusted
+
+    adj_watcher.reset()
+    assert not adj_watcher.adjusted
+
+
 def _test_loop(printer):
     orig_delta = printer.clock_watcher.delta
     adjust_clock(printer.clock_watcher)
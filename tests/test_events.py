@@ -1,4 +1,6 @@
 """Test for events functionality"""
+import json
+
 from prusa.connect.printer import Event, const
 
 # pylint: disable=missing-function-docstring
@@ -38,3 +40,44 @@ def test_kwargs():
     assert payload['reason'] == "Chuck Norris"
     assert payload['state'] == "FINISHED"
     assert payload['dialog_id'] == 33
+
+
+def test_pool():
+    event = Event.acquire(const.Event.INFO, const.Source.WUI, data="data")
+    event.release()
+    recycled = Event.acquire(const.Event.STATE_CHANGED,
+                             const.Source.CONNECT,
+                             command_id=42)
+    assert recycled is event
+    payload = recycled.to_payload()
+    assert payload['event'] == 'STATE_CHANGED'
+    assert payload['source'] == 'CONNECT'
+    assert payload['command_id'] == 42
+    assert payload['data'] == {}
+
+
+def test_pool_reset():
+    data = object()
+    event = Event.acquire(const.Event.INFO, const.Source.WUI, data=data)
+    event.release()
+    assert data not in event.data.values()
+
+
+def test_pool_subclass():
+    class MyEvent(Event):
+        """Event subclass without its own pool"""
+
+    event = MyEvent.acquire(const.Event.INFO, const.Source.WUI)
+    event.release()
+    recycled = Event.acquire(const.Event.INFO, const.Source.WUI)
+    assert recycled is not event
+    assert type(recycled) is Event
+    assert type(MyEvent.acquire(const.Event.INFO, const.Source.WUI)) is MyEvent
+
+
+def test_to_json():
+    event = Event(const.Event.INFO, const.Source.WUI, data="data")
+    data = event.to_json()
+    assert json.loads(data) == event.to_payload()
+    # enum members are serialized as their string values
+    assert json.loads(data)["event"] == const.Event.INFO == "INFO"
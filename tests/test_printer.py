@@ -1,4 +1,5 @@
 """Test for Printer object."""
+import gzip
 import io
 import json
 import os
@@ -106,6 +107,11 @@ class TestPrinter:
         with pytest.raises(RuntimeError):
             printer.fingerprint = "foo"
 
+    def test_connection_pool(self, printer):
+        for prefix in ("http://", "https://"):
+            adapter = printer.conn.get_adapter(prefix)
+            assert adapter._pool_maxsize == const.POOL_MAXSIZE
+
     def test_no_fingerprint(self, printer_no_fp):
         """Create a use a printer with no fingerprint"""
         assert printer_no_fp.is_initialised() is False
@@ -149,6 +155,16 @@ class TestPrinter:
         assert req.headers["User-Agent-Version"] == printer.software
         assert req.headers["Token"] == printer.token
 
+    def test_headers_update(self, printer_no_fp):
+        assert printer_no_fp.make_headers()["Fingerprint"] is None
+        printer_no_fp.fingerprint = FINGERPRINT
+        printer_no_fp.token = None
+        headers = printer_no_fp.make_headers()
+        assert headers["Fingerprint"] == FINGERPRINT
+        assert "Token" not in headers
+        printer_no_fp.token = TOKEN
+        assert printer_no_fp.make_headers()["Token"] == TOKEN
+
     def test_telemetry_no_fingerprint(self, printer_no_fp):
         printer_no_fp.telemetry(temp_bed=1, temp_nozzle=2)
         item = printer_no_fp.queue.get_nowait()
@@ -218,6 +234,64 @@ class TestPrinter:
         assert info["event"] == "INFO"
         assert info["source"] == "WUI"
 
+    def test_loop_batch(self, requests_mock, printer):
+        requests_mock.post(SERVER + "/p/telemetry", status_code=204)
+        requests_mock.post(SERVER + "/p/events", status_code=204)
+        printer.max_batch_size = 2
+        printer.telemetry(timestamp=10)
+        printer.telemetry(timestamp=20)
+        printer.telemetry(timestamp=30)
+        printer.event_cb(const.Event.INFO, const.Source.WUI, command_id=42)
+
+        run_loop(printer.loop)
+
+        history = requests_mock.request_history
+        assert len(history) == 3
+        assert str(history[0]) == f"POST {SERVER}/p/telemetry"
+        assert history[0].headers["Timestamp"] == "20"
+        assert history[0].json() == [
+            {'state': 'BUSY', 'timestamp': 10},
+            {'state': 'BUSY', 'timestamp': 20},
+        ]
+        # a different kind of item ends the batch
+        assert history[1].json() == {'state': 'BUSY'}
+        assert str(history[2]) == f"POST {SERVER}/p/events"
+        assert history[2].json()["command_id"] == 42
+
+    def test_loop_compress(self, requests_mock, printer):
+        requests_mock.post(SERVER + "/p/telemetry", status_code=204)
+        printer.max_batch_size = 100
+        printer.compress_payloads = True
+        for i in range(50):
+            printer.telemetry(timestamp=i + 1, temp_nozzle=215.0)
+        run_loop(printer.loop)
+        printer.telemetry(timestamp=60)
+        run_loop(printer.loop)
+
+        history = requests_mock.request_history
+        assert len(history) == 2
+        assert history[0].headers["Content-Encoding"] == "gzip"
+        payload = json.loads(gzip.decompress(history[0].body))
+        assert len(payload) == 50
+        assert payload[0] == {
+            'state': 'BUSY',
+            'temp_nozzle': 215.0,
+            'timestamp': 1,
+        }
+        # small payloads are not worth compressing
+        assert "Content-Encoding" not in history[1].headers
+        assert history[1].json() == {'state': 'BUSY'}
+
+    def test_idle_timeout(self, printer):
+        for _ in range(2):
+            with pytest.raises(queue.Empty):
+                printer.get_item()
+        assert printer.idle_timeout == pytest.approx(0.4)
+
+        printer.telemetry()
+        assert isinstance(printer.get_item(), Telemetry)
+        assert printer.idle_timeout == const.TIMESTAMP_PRECISION
+
     def test_loop_exception(self, requests_mock, printer):
         requests_mock.post(SERVER + "/p/events",
                            status_code=400,
@@ -696,13 +770,19 @@ class TestPrinter:
         requests_mock.get(SERVER + "/p/register", status_code=202)
 
         printer.queue.put(Register(tmp_code))
-        run_loop(printer.loop, timeout=1.1)
+        run_loop(printer.loop, timeout=0.5)
 
         assert (str(
             requests_mock.request_history[0]) == f"GET {SERVER}/p/register")
+        assert len(requests_mock.request_history) == 1
+        assert requests_mock.request_history[0].headers["Code"] == tmp_code
         assert printer.token is None
-        item = printer.queue.get_nowait()
-        assert item.code == tmp_code
+        assert printer.queue.empty()
+
+        # the registration is polled again after a second, not sooner
+        run_loop(printer.loop, timeout=1)
+        assert len(requests_mock.request_history) == 2
+        assert requests_mock.request_history[1].headers["Code"] == tmp_code
 
     def test_load_lan_settings(self, lan_settings_ini):
         printer = Printer(const.PrinterType.I3MK3, SN, FINGERPRINT)
@@ -851,6 +931,13 @@ class TestPrinter:
             "/N/A/file.txt')",
         }
 
+    def test_url_download_no_kwargs(self, printer):
+        caller = Command(printer.event_cb)
+        # the message is sent to Connect, same on all Python versions
+        with pytest.raises(ValueError) as exc_info:
+            printer.start_url_download(caller)
+        assert str(exc_info.value) == "START_URL_DOWNLOAD requires kwargs"
+
     def test_url_download(self, requests_mock, printer_sdcard):
         url = "http://prusaprinters.org/my.gcode"
         path = "/sdcard/my.gcode"
@@ -1,4 +1,6 @@
 """Tests for telemetry functionality"""
+import json
+
 from prusa.connect.printer import Telemetry, const
 
 # pylint: disable=missing-function-docstring
@@ -16,3 +18,19 @@ def test_telemetry():
     telemetry = Telemetry(const.State.BUSY, axis_x=3.1, fan=None)
     payload = telemetry.to_payload()
     assert payload == {'state': 'BUSY', 'axis_x': 3.1}
+
+
+def test_state_telemetry_json():
+    telemetry = Telemetry(const.State.READY)
+    assert json.loads(telemetry.to_json()) == {'state': 'READY'}
+    # the same body is shared by all telemetries with just the state
+    assert Telemetry(const.State.READY).to_json() is telemetry.to_json()
+
+    telemetry = Telemetry(const.State.READY, fan=None)
+    assert json.loads(telemetry.to_json()) == {'state': 'READY'}
+
+
+def test_pool_reset():
+    telemetry = Telemetry.acquire(const.State.PRINTING, progress=42)
+    telemetry.release()
+    assert telemetry.to_payload() == {}